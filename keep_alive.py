@@ -4,39 +4,145 @@ Programmer: Kalle Rantalainen
 Email: kalle.rantalainen@tuni.fi
 Date: 13.01.2023
 
-This file creates the web application and calls the
-update_web_page function from the scraping.py file
-to update the html template of the web page.
+This file creates the web application and starts a
+thread that calls the update_web_page function from the
+scraping.py file every 2 seconds to get the information
+that is rendered into the html template of the web page.
+The open web pages get the new information from the
+/events stream whenever it changes.
 """
 from flask import Flask, render_template
+from a2wsgi import WSGIMiddleware
 from threading import Thread
+import asyncio
+import orjson
+import time
+import uvicorn
 
 from scraping import update_web_page
 
 app = Flask('')
-app.config.update(TEMPLATES_AUTO_RELOAD=True)
+
+# uvicorn serves ASGI applications, so the Flask app is wrapped
+# into one. Each request is handled in a pool of threads so
+# multiple requests can be served at the same time.
+wsgi_app = WSGIMiddleware(app, workers=16)
+
+# The latest information about the pilots. This is updated
+# by the scraping thread and read when the web page is loaded.
+# displayed_pilots holds only the fields that are shown on
+# the web page, and pilots_version is increased every time
+# they change so that the /events stream knows when to send
+# them. pilots_event is displayed_pilots already formatted
+# as an event, so it is only encoded once no matter how many
+# web pages are open.
+DISPLAYED_FIELDS = ("firstName", "lastName", "phoneNumber", "email",
+                    "closestDistance")
+current_pilots = {}
+displayed_pilots = []
+pilots_version = 0
+pilots_event = b"data: []\n\n"
+
+# The start of every /events response is the same.
+EVENTS_RESPONSE_START = {"type": "http.response.start", "status": 200,
+                         "headers": [(b"content-type", b"text/event-stream"),
+                                     (b"cache-control", b"no-cache")]}
 
 @app.route('/')
 def home():
     """
     Defining the home page of the web page. This function
-    renders the updated html template for the web page.
+    renders the html template with the latest information
+    about the pilots.
     :return: html template for the web page
     """
-    update_web_page()
-    return render_template("information.html")
+    return render_template("information.html", pilots=current_pilots)
+
+async def wait_for_disconnect(receive):
+    """
+    Waits until the client of the /events stream has
+    closed the connection.
+    :param receive: ASGI receive function of the request
+    """
+    while (await receive())["type"] != "http.disconnect":
+        pass
+
+async def events(scope, receive, send):
+    """
+    Server-Sent Events stream of the pilot information. The
+    information is sent when the client connects and then
+    every time it changes, so the web page does not need to
+    be refreshed. This is served directly by uvicorn instead
+    of Flask so an open stream does not reserve a thread.
+    """
+    await send(EVENTS_RESPONSE_START)
+
+    disconnected = asyncio.ensure_future(wait_for_disconnect(receive))
+    sent_version = None
+    try:
+        while not disconnected.done():
+            if sent_version != pilots_version:
+                sent_version = pilots_version
+                await send({"type": "http.response.body",
+                            "body": pilots_event, "more_body": True})
+            await asyncio.sleep(0.5)
+    finally:
+        disconnected.cancel()
+
+async def asgi_app(scope, receive, send):
+    """
+    The application served by uvicorn. The /events stream
+    is handled here and every other request is passed on
+    to the Flask app.
+    """
+    if scope["type"] == "http" and scope["path"] == "/events":
+        await events(scope, receive, send)
+    else:
+        await wsgi_app(scope, receive, send)
+
+def scrape_loop():
+    """
+    Updates the information about the pilots every 2 seconds
+    so that loading the web page does not have to wait for
+    the scraping.
+    """
+    global current_pilots, displayed_pilots, pilots_version, pilots_event
+    while True:
+        try:
+            pilots = update_web_page()
+            current_pilots = pilots
+
+            # The time of violation changes on every update while
+            # a drone is in the nfz, but it is not shown on the web
+            # page. So the web pages only get the shown fields and
+            # only when some of them has changed.
+            displayed = [{field: pilot[field] for field in DISPLAYED_FIELDS}
+                         for pilot in pilots.values()]
+            if displayed != displayed_pilots:
+                displayed_pilots = displayed
+                pilots_event = b"data: " + orjson.dumps(displayed) + b"\n\n"
+                pilots_version += 1
+        except Exception as error:
+            # If the update fails, the page keeps showing the
+            # previous information and we try again next time.
+            print("Tietojen päivittäminen epäonnistui:", error)
+        time.sleep(2)
 
 def run():
     """
     This function is only called at the start of the program
-    to run the web server.
+    to run the web server. uvicorn uses uvloop as the event
+    loop if it is installed.
     """
-    app.run(host='0.0.0.0', port=8080)
+    uvicorn.run(asgi_app, host='0.0.0.0', port=8080, loop="auto")
 
 def keep_alive():
     """
-    Starts a separate thread for the web server
-    at the beginning of the program.
+    Starts a separate thread for the web server and
+    a thread for updating the information at the
+    beginning of the program.
     """
+    scraper = Thread(target=scrape_loop, daemon=True)
+    scraper.start()
     t = Thread(target=run)
     t.start()
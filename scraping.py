@@ -8,100 +8,236 @@ This file is used to scrape and process information found
 from:
 	- https://assignments.reaktor.com/birdnest/drones
 	- https://assignments.reaktor.com/birdnest/pilots/...
-This file writes the information about drone pilots that
+This file keeps the information about drone pilots that
 have broken the no-fly zone for 10 minutes. The information
-is stored to pilot_information.json and information.html files.
-This file is called from the keep_alive.py file every 2 seconds.
-So the pilot_information.json and the information.html is
-updated every 2 seconds.
+is returned to keep_alive.py which renders it into the
+information.html template. This file is called from the
+keep_alive.py file every 2 seconds, so the web page is
+updated every 2 seconds. The information is also saved
+into pilot_information.json about once a minute so it is
+not lost if the program is restarted.
 """
 
 
 # Importing libraries that are needed in this file
-from bs4 import BeautifulSoup
 import requests
-import json
+from requests.adapters import HTTPAdapter
+import aiohttp
+import asyncio
+import orjson
+import msgspec
 from math import sqrt
+import numpy as np
+import threading
+import time
 import datetime
+import os
+import re
+
+# lxml is used to parse the drone data if it is installed.
+# Otherwise the information is read from the xml data with
+# DRONE_RE which works because the xml data is very simple.
+try:
+	from lxml import etree
+except ImportError:
+	etree = None
+
+# DRONE_RE finds one <drone> element at a time and the
+# other three read the fields inside it, so a drone without
+# some field is skipped instead of getting the value from
+# the next drone. The fields can be in any order.
+DRONE_RE = re.compile(rb"<drone>(.*?)</drone>", re.S)
+SERIAL_NUMBER_RE = re.compile(rb"<serialNumber>([^<]+)</serialNumber>")
+POSITION_X_RE = re.compile(rb"<positionX>([^<]+)</positionX>")
+POSITION_Y_RE = re.compile(rb"<positionY>([^<]+)</positionY>")
+
+
+# All of the drone data requests go through the same session
+# so the connection to the server is kept open and reused
+# instead of opening a new connection every 2 seconds.
+_session = requests.Session()
+_session.mount("https://", HTTPAdapter(pool_connections=16, pool_maxsize=16))
+
+# The information of a pilot does not change, so once it
+# has been fetched it can be reused for as long as we keep
+# the pilot on the web page. _pilot_cache maps drone serial
+# numbers to the time of the fetch and the pilot information.
+PILOT_CACHE_TTL = 600
+_pilot_cache = {}
+_pilot_cache_lock = threading.Lock()
+
+
+class Pilot(msgspec.Struct):
+	"""
+	Only these fields of the pilot information are shown on
+	the web page, so the rest of the fields are not decoded.
+	"""
+	pilotId: str
+	firstName: str
+	lastName: str
+	phoneNumber: str
+	email: str
+
+
+_pilot_decoder = msgspec.json.Decoder(Pilot)
 
+# The information about the pilots that have violated the
+# nfz in the past 10 minutes is kept in _state between the
+# updates. It is written into pilot_information.json every
+# CHECKPOINT_INTERVAL updates so that it can be loaded again
+# if the program is restarted.
+CHECKPOINT_INTERVAL = 30
+_state = {}
+_tick_counter = 0
 
-def check_forbidden_coords(data):
+# Hash of the pilot information that was last written to
+# pilot_information.json. The file is only written again
+# when the information has changed.
+_last_payload_hash = None
+
+
+def check_forbidden_coords(data, time_now):
 	"""
 	No fly zone (NFZ) is circle with radius of 100 000 at position
 	(250 000, 250 000). The drone pilot is not allowed to enter
-	this circle. This function reads the xml file from the web
-	and checks if any of the pilots in the 500 000 x 500 000 area
-	is in the circle.
+	this circle. This function goes through the drone data from
+	the web and checks if any of the pilots in the 500 000 x
+	500 000 area is in the circle.
+	:param data: list of (serial number, x, y) tuples of the drones
+	:param time_now: time of this update in seconds since the epoch
 	:return: Dictionary which keys are serial_numbers of drones
 	and value is time that when the pilot violated the no drone zone
 	and the distance between the drone and the nest.
 	"""
-	# We can extract drone information from the data and
-	# make a list that includes every drone and information
-	# about them.
-	drones = data.find_all("drone")
-
-	# Next we need to find every drone which coordinates
-	# are illegal. We store the illegal drone's serial number
-	# to dict called illegal_drone_ids
-
+	# We can collect the coordinates of the drones into numpy
+	# arrays. The same index in the arrays and in data belongs
+	# to the same drone.
+	x_coords = np.fromiter((drone[1] for drone in data),
+						   dtype=np.float64, count=len(data))
+	y_coords = np.fromiter((drone[2] for drone in data),
+						   dtype=np.float64, count=len(data))
+
+	# Now we can check which coords are illegal. The drone is
+	# inside the nfz if its distance d from (250000, 250000)
+	# is 100 000 or less. d = sqrt((x1-x2)^2+(y1-y2)^2), but
+	# we can compare the squared distance to 100000^2 for all
+	# of the drones at once and only calculate the square root
+	# for the drones that are inside the nfz.
+	squared_distances = (x_coords - 250000.0) ** 2 + (y_coords - 250000.0) ** 2
+	in_nfz = squared_distances <= 100000.0 * 100000.0
+
+	# Next we store the illegal drone's serial number to dict
+	# called illegal_drone_ids with the time the drone
+	# violated the nfz and the distance to the nest. The
+	# time is stored as seconds since the epoch so it can
+	# be compared without parsing it again later.
 	illegal_drone_ids = {}
 
-	for drone in drones:
-		x_coord_str = str(drone.find("positionX"))
-		y_coord_str = str(drone.find("positionY"))
-
-		# Now each coordinate is in format "<position>xxxxx.xxxxx</position>"
-		# and we only want the number inside position tags
-		x_coord_splitted = str(x_coord_str).split(">")[1].split("<")[0]
-		y_coord_splitted = str(y_coord_str).split(">")[1].split("<")[0]
-
-		# Converting the number into float so we can use them to
-		# calculate distance.
-		x_coord = float(x_coord_splitted)
-		y_coord = float(y_coord_splitted)
-
-		# Now we can check if coords are illegal. We can also calculate
-		# the distance from drone's coordinates to (250000, 250000)
-		# with equation d = sqrt((x1-x2)^2+(y1-y2)^2). We can detect
-		# the time drone violated the nfz
-		if 150000 < x_coord < 350000:
-			# x_coord is inside of the nfz. (this could also
-			# be done with y_coord nut I chose x.) Now we can
-			# calculate the distance to the drone position
-			# form the nest location. If the distance is
-			# 100 or less than 100, then the y_coordinate is
-			# also inside of the nfz and we can add the
-			# drones serial number to illegal drones dict.
-			distance = sqrt((250000 - x_coord) ** 2 + (250000 - y_coord) ** 2)
-
-			if distance <= 100000:
-				# Drone is inside the nfz
-				ser_num_str = str(drone.find("serialNumber"))
-				ser_num = str(ser_num_str).split(">")[1].split("<")[0]
-				time = datetime.datetime.now()
-				illegal_drone_ids[ser_num] = [str(time), distance]
+	for index in np.nonzero(in_nfz)[0]:
+		distance = sqrt(squared_distances[index])
+		illegal_drone_ids[data[index][0]] = [time_now, distance]
 
 	return illegal_drone_ids
 
 
 
-def get_pilot_data(drones_in_nfz):
+async def _fetch_pilot(session, serial_number):
+	"""
+	Fetches the information of a single pilot from the web.
+	:param session: aiohttp session used for the request
+	:param serial_number: serial number of the pilot's drone
+	:return: pilot information as a python dict
+	"""
+	# url for the pilot information is in format
+	# https://assignments.reaktor.com/birdnest/pilots/_____
+	# where the last part is drone's serial number.
+	url = "https://assignments.reaktor.com/birdnest/pilots/" + serial_number
+
+	async with session.get(url) as response:
+		json_data = await response.read()
+
+	# msgspec only decodes the fields defined in Pilot, so
+	# the rest of the response is never turned into python
+	# objects. The pilot is then turned into a pyhton dict
+	# so we can easily modify it with python.
+	pilot = _pilot_decoder.decode(json_data)
+	return msgspec.structs.asdict(pilot)
+
+
+async def _fetch_all(serial_numbers):
+	"""
+	Fetches the information of every pilot concurrently instead
+	of waiting for each request to finish before sending the
+	next one. All of the requests share one session so they
+	also share the same connection pool. A request that takes
+	over 5 seconds or gets an error status fails, but it does
+	not stop the other requests.
+	:param serial_numbers: list of drone serial numbers
+	:return: list of pilot dicts or exceptions in the same order
+	as serial_numbers
+	"""
+	timeout = aiohttp.ClientTimeout(total=5)
+	async with aiohttp.ClientSession(timeout=timeout,
+									 raise_for_status=True) as session:
+		return await asyncio.gather(
+			*[_fetch_pilot(session, serial) for serial in serial_numbers],
+			return_exceptions=True)
+
+
+def _get_pilots(serial_numbers):
+	"""
+	Returns the information of the pilots of the given drones.
+	Only the pilots that are not already in _pilot_cache are
+	fetched from the web.
+	:param serial_numbers: list of drone serial numbers
+	:return: dict which keys are the serial numbers and values
+	are the pilot dicts. Serial numbers whose pilot could not
+	be fetched are left out.
+	"""
+	with _pilot_cache_lock:
+		time_now = time.monotonic()
+
+		# Removing the pilots that have been in the cache
+		# for longer than PILOT_CACHE_TTL seconds.
+		expired = [serial for serial, (fetched_at, _) in _pilot_cache.items()
+				   if time_now - fetched_at > PILOT_CACHE_TTL]
+		for serial in expired:
+			del _pilot_cache[serial]
+
+		missing = [serial for serial in serial_numbers
+				   if serial not in _pilot_cache]
+		if missing:
+			pilots = asyncio.run(_fetch_all(missing))
+			for serial, pilot in zip(missing, pilots):
+				if isinstance(pilot, BaseException):
+					# This pilot is tried again in the next update
+					# if the drone is still in the nfz.
+					print("Lentäjän", serial, "hakeminen epäonnistui:", repr(pilot))
+				else:
+					_pilot_cache[serial] = (time_now, pilot)
+
+		# Returning copies so that the caller can add its own
+		# fields without changing the cached information.
+		return {serial: dict(_pilot_cache[serial][1])
+				for serial in serial_numbers if serial in _pilot_cache}
+
+
+def get_pilot_data(drones_in_nfz, time_now):
 	"""
 	This function scrapes data off of every pilot who has
 	violated the nfz. All of these pilots can be found
 	with the drones_in_nfz because it contains all the
 	serial numbers for the drones in the nfz. This function
 	also updates the information scraped from the web into
-	pilot_information.json file.
+	_state and from time to time into pilot_information.json
+	file.
+	:param drones_in_nfz: dict returned by check_forbidden_coords
+	:param time_now: time of this update in seconds since the epoch
+	:return: Dictionary which keys are pilot ids and values
+	are the information about the pilots that have violated
+	the nfz in the past 10 minutes.
 	"""
-	# url for the pilot information is in format
-	# https://assignments.reaktor.com/birdnest/pilots/_____
-	# where the last part is drone's serial number. We can
-	# get information from every person that has violated
-	# the nfz with replacing the last part with the drone's
-	# serial number.
-	url = "https://assignments.reaktor.com/birdnest/pilots/"
+	global _state, _tick_counter
 
 	# We have a dict of drone serial numbers that violated
 	# the nfz recently. The dict also contains the time of
@@ -111,17 +247,11 @@ def get_pilot_data(drones_in_nfz):
 	# Pilot information is stored into dict called pilot_data.
 	pilot_data = {}
 
-	for drone in drones_in_nfz:
-		# Adding the drone's serial number to the url.
-		new_url = url + drone
-
-		# Getting the json formatted data from the website.
-		json_data = requests.get(new_url).content
-
-		# json data is turned into pyhton dict so we can easily
-		# modify it with python.
-		json_object = json.loads(json_data)
+	# Getting the information of every pilot. The results
+	# come back as a dict with the serial numbers as keys.
+	pilots = _get_pilots(list(drones_in_nfz))
 
+	for drone, json_object in pilots.items():
 		# Because the data does not include information when
 		# the drone violated the nfz, we need to add it. We
 		# also want to add the closest distance from the nest
@@ -133,198 +263,199 @@ def get_pilot_data(drones_in_nfz):
 		# pilotId as a key.
 		pilot_data[json_object["pilotId"]] = json_object
 
-	# saved_pilot_info is a dict to which we can load information
-	# that we have gotten previously from the pilots.
-	saved_pilot_info = {}
-
-	with open("pilot_information.json") as json_file:
-		# Sometimes there is a error in opening the jason
-		# file and this try - except catches it.
-		try:
-			# Loading info about previously encountered criminal pilots
-			# into saved_pilot_info dict from file pilot_information.json
-			saved_pilot_info = json.load(json_file)
-
-			# Looping through the newly acquired pilot data
-			# to see if the old data already contains the pilot
-			# or if the pilot is new. Then we update the
-			# saved_pilot_info accordingly.
-			for pilot_id in pilot_data:
-				if pilot_id in saved_pilot_info.keys():
-					# The pilot has already broken the law in the past
-					# 10 minutes, so we need to update the time of violation.
-					saved_pilot_info[pilot_id]["timeOfViolation"] = pilot_data[pilot_id]["timeOfViolation"]
-
-					if saved_pilot_info[pilot_id]["closestDistance"] > pilot_data[pilot_id]["closestDistance"]:
-						# The pilot got closer to the nest this time than
-						# previously so we need to update the closest
-						# drones closest distance to the nest.
-						saved_pilot_info[pilot_id]["closestDistance"] = pilot_data[pilot_id]["closestDistance"]
-				else:
-					# The pilot wasn't in the dict before so
-					# we can make new element to the dict containing
-					# pilot_id as key and data of the pilot as value.
-					saved_pilot_info[pilot_id] = pilot_data[pilot_id]
-			json_file.close()
-		except json.decoder.JSONDecodeError:
-			# catching error
-			print("Errori tulee ilmeisesti tyhjästä json tiedososta")
-
-	# to_be_deleted is a list in which we can push all the pilots
-	# we might want to delete from the saved_pilot_info. We want to delete
-	# the information in case that the pilot violated
-	# the no fly zone 10 minutes ago.
-	to_be_deleted = []
-
-	for pilot_id in saved_pilot_info:
-		# Getting current time
-		time_now = datetime.datetime.now()
-		# Getting the last time when the pilot violated the
-		# nfz from the saved_pilot_data. And formatting the
-		# string data back to datetime object.
-		time_of_violation = datetime.datetime.\
-			strptime(saved_pilot_info[pilot_id]["timeOfViolation"],
-					 '%Y-%m-%d %H:%M:%S.%f')
-
-		# Because both times are now datetime object
-		# we can just simply subtract the previous
-		# time of violation from current time and
-		# see if the crime happened over 10 minutes ago.
-		difference = time_now - time_of_violation
-
-		# Appending the pilot_id to the to_be_deleted list
-		# if the crime happened over 600 seconds -> 10 minutes ago.
-		if difference.seconds > 600:
-			to_be_deleted.append(pilot_id)
-
-	# Deleting all of the pilots from the dict if
-	# they were last seen in the nfz over 10 minutes
-	# ago.
-	for key in to_be_deleted:
-		del saved_pilot_info[key]
-
-	# Now we can update the pilot_information file
-	with open("pilot_information.json", "w") as writing_file:
-		json.dump(saved_pilot_info, writing_file, indent=4)
-	writing_file.close()
-
-
-def get_drone_data():
+	# The pilots are collected into a new dict instead of
+	# changing _state, because the previous _state may still
+	# be used to render the web page. First we only keep the
+	# pilots from _state that violated the no fly zone less
+	# than 600 seconds -> 10 minutes ago. Because the times
+	# are seconds since the epoch, we can simply compare them
+	# to the cutoff.
+	cutoff = time_now - 600
+	new_state = {pilot_id: pilot for pilot_id, pilot in _state.items()
+				 if pilot["timeOfViolation"] >= cutoff}
+
+	# Looping through the newly acquired pilot data
+	# to see if _state already contains the pilot
+	# or if the pilot is new.
+	for pilot_id, pilot in pilot_data.items():
+		existing = _state.get(pilot_id)
+		if existing:
+			# The pilot has already broken the law in the past
+			# 10 minutes, so we need to update the time of violation.
+			# If the pilot got closer to the nest this time than
+			# previously we also need to update the drones closest
+			# distance to the nest.
+			new_state[pilot_id] = {
+				**existing,
+				"timeOfViolation": pilot["timeOfViolation"],
+				"closestDistance": min(existing["closestDistance"],
+									   pilot["closestDistance"])}
+		else:
+			# The pilot wasn't in the dict before so
+			# we can make new element to the dict containing
+			# pilot_id as key and data of the pilot as value.
+			new_state[pilot_id] = pilot
+
+	_state = new_state
+
+	# Every CHECKPOINT_INTERVAL updates we also update
+	# the pilot_information file.
+	_tick_counter += 1
+	if _tick_counter % CHECKPOINT_INTERVAL == 0:
+		save_pilot_info(_state)
+
+	# The returned dict is never changed afterwards, so the
+	# web page can be rendered from it while the next update
+	# builds a new _state.
+	return _state
+
+
+def load_pilot_info():
 	"""
-	Getting the data that includes for example the drone coordinates
-	and the drones serial number from the web.
-	:return: returns the data of all of the drones in the 500x500m square.
+	Loads the pilot information that was saved into
+	pilot_information.json file before the program was
+	restarted.
+	:return: dict of the pilot information
 	"""
-	# url to the drone data website
-	url = "https://assignments.reaktor.com/birdnest/drones"
+	try:
+		with open("pilot_information.json", "rb") as json_file:
+			saved_pilot_info = orjson.loads(json_file.read())
+	except FileNotFoundError:
+		# The program is run for the first time.
+		return {}
+	except orjson.JSONDecodeError:
+		# catching error
+		print("Errori tulee ilmeisesti tyhjästä json tiedososta")
+		return {}
+
+	# Older versions of this program saved the time of
+	# violation as a string, so it is converted into seconds
+	# since the epoch. Pilots without a valid time are dropped.
+	loaded_pilot_info = {}
+	for pilot_id, pilot in saved_pilot_info.items():
+		time_of_violation = pilot.get("timeOfViolation")
+		if isinstance(time_of_violation, str):
+			try:
+				time_of_violation = datetime.datetime.strptime(
+					time_of_violation, '%Y-%m-%d %H:%M:%S.%f').timestamp()
+			except ValueError:
+				continue
+		if isinstance(time_of_violation, (int, float)):
+			pilot["timeOfViolation"] = time_of_violation
+			loaded_pilot_info[pilot_id] = pilot
+
+	return loaded_pilot_info
+
+
+def save_pilot_info(saved_pilot_info):
+	"""
+	Writes the pilot information into pilot_information.json
+	file if it has changed since the last write. The data is
+	first written into a temporary file which then replaces
+	the old file, so the file is never left half written.
+	:param saved_pilot_info: dict of the pilot information
+	"""
+	global _last_payload_hash
+
+	payload = orjson.dumps(saved_pilot_info, option=orjson.OPT_INDENT_2)
+	payload_hash = hash(payload)
+
+	if payload_hash == _last_payload_hash:
+		# Nothing has changed since the last write.
+		return
 
-	# The data is in xml format and is saved
-	# to variable called xml data.
-	xml_data = requests.get(url).content
+	with open("pilot_information.json.tmp", "wb") as writing_file:
+		writing_file.write(payload)
+	os.replace("pilot_information.json.tmp", "pilot_information.json")
 
-	# BeautifulSoup makes the xml data into prettier
-	# form and we can use to get information.
-	soup = BeautifulSoup(xml_data, "xml")
-	soup.prettify()
+	_last_payload_hash = payload_hash
 
-	return soup
+
+def parse_drones(xml_data):
+	"""
+	Reads the serial number and coordinates of every drone
+	from the xml data.
+	:param xml_data: the drone data in xml format as bytes
+	:return: list of (serial number, x, y) tuples
+	"""
+	if etree is not None:
+		# lxml parses the xml data into a tree of elements
+		# from which we can easily get the information.
+		root = etree.fromstring(xml_data)
+		drones = []
+		for drone in root.iter("drone"):
+			serial_number = drone.findtext("serialNumber")
+			x_coord = drone.findtext("positionX")
+			y_coord = drone.findtext("positionY")
+			if serial_number is None or x_coord is None or y_coord is None:
+				# A drone without some field is skipped.
+				continue
+			drones.append((serial_number, float(x_coord), float(y_coord)))
+		return drones
+
+	# Without lxml every drone is found with one pass of
+	# DRONE_RE over the xml data.
+	drones = []
+	for match in DRONE_RE.finditer(xml_data):
+		drone = match.group(1)
+		serial_number = SERIAL_NUMBER_RE.search(drone)
+		x_coord = POSITION_X_RE.search(drone)
+		y_coord = POSITION_Y_RE.search(drone)
+		if serial_number is None or x_coord is None or y_coord is None:
+			# A drone without some field is skipped.
+			continue
+		drones.append((serial_number.group(1).decode(),
+					   float(x_coord.group(1)), float(y_coord.group(1))))
+	return drones
 
 
-def convert_info_into_html():
+def get_drone_data():
 	"""
-	This function converts all off the data that we have
-	gotten from the web pages and prosessed with function in
-	this file into a html format. The data is then saved
-	into html file.
+	Getting the data that includes for example the drone coordinates
+	and the drones serial number from the web.
+	:return: returns the serial numbers and coordinates of all of
+	the drones in the 500x500m square as (serial number, x, y) tuples.
 	"""
+	# url to the drone data website
+	url = "https://assignments.reaktor.com/birdnest/drones"
 
-	with open("pilot_information.json") as json_file:
-		json_object = json.load(json_file)
-	json_file.close()
-
-	# The html file always consists these lines
-	# off code so no matter how many pilots have
-	# visited the no fly zone, the html file
-	# will always have these lines in it. Now if
-	# we have gathered information about criminal drone
-	# pilots, we can append the information into this list
-	# between the </h1> an </body> tag so in the -2 index
-	# of the list. The base also includes tag
-	# <meta http-equiv="refresh" content="2"> which causes
-	# the web page tp auto refresh in every 2 seconds.
-	base_html = ['<!DOCTYPE html>\n', '<html lang="en">\n',
-				 '    <head>\n', '    <meta charset="UTF-8"><title>NFZ</title>\n',
-				 '    <meta http-equiv="refresh" content="2">\n',
-				 '    <title> NFZ </title>\n',
-				 '    </head>\n', '<body>\n',
-				 '    <h1 style="font-family: Arial">\n',
-				 '        Pilots that recently violated the NFZ\n',
-				 '    </h1>\n', '</body>\n', '</html>']
-
-	# going through the dict that contains
-	# information about the law breakers
-	for pilot_id in json_object:
-		# Saving the pilot name in a html format in
-		# variable called html_name. The same is done
-		# to all information that needs to be shown on
-		# the web page.
-		html_name = f'<h3 style="font-family: Arial"> Pilot:' \
-					f' {json_object[pilot_id]["firstName"]}' \
-					f' {json_object[pilot_id]["lastName"]} </h3>\n'
-		html_phone = f'<p style="font-family: Arial"> Phone number:' \
-					 f' {json_object[pilot_id]["phoneNumber"]} </p>\n'
-		html_email = f'<p style="font-family: Arial"> Email address:' \
-					 f' {json_object[pilot_id]["email"]} </p>\n'
-		html_dis = f'<p style="font-family: Arial"> Closest distance to the nest:' \
-				   f' {float(json_object[pilot_id]["closestDistance"])/1000:.2f}' \
-				   f' meters. </p>\n'
-		# Inserting the information into base_html list
-		base_html.insert(-2, html_name)
-		base_html.insert(-2, html_phone)
-		base_html.insert(-2, html_email)
-		base_html.insert(-2, html_dis)
-
-	# If the third last element is '    </h1>\n,
-	# then there has not been any violations in the nfz
-	# for the past 10 minutes.
-	if str(base_html[-3]) == '    </h1>\n':
-		# No one has been in the nfz fro 10 minutes
-		base_html.insert(-2, '<p style="font-family: Arial"> No drones seen in the'
-							 ' NFZ for 10 minutes </p>')
-
-	# Opening the html file of the web page.
-	html_file_object = open("templates/information.html", "w")
-
-	# Writing the file again with new updated information
-	for line in base_html:
-		html_file_object.write(line)
-
-	html_file_object.close()
+	# The data is in xml format and is saved to variable
+	# called xml data. If the request or the parsing fails,
+	# the error goes to the scraping thread in keep_alive.py
+	# which keeps showing the previous information.
+	response = _session.get(url, timeout=5)
+	response.raise_for_status()
+	xml_data = response.content
 
+	return parse_drones(xml_data)
 
 
 def update_web_page():
 	"""
 	This is kind of a main function for this file.
-	This function is called every 2 seconds or when
-	a user updates the website. This function is
-	called from the keep_alive.py files home function
-	to update the information on the webpage.
+	This function is called every 2 seconds from the
+	scraping thread started in keep_alive.py to update
+	the information on the webpage.
+	:return: Dictionary of the pilots that have violated
+	the nfz in the past 10 minutes.
 	"""
 	# Getting the data of all the drones that
 	# the device has detected in the 500x500m square.
 	drone_data = get_drone_data()
 
+	# Getting current time once for the whole update.
+	time_now = time.time()
+
 	# Calculating if some of the drones are in the no
 	# drone/ no fly zone.
-	drones_in_nfz = check_forbidden_coords(drone_data)
+	drones_in_nfz = check_forbidden_coords(drone_data, time_now)
 
 	# Getting data of the pilots that went to the
-	# no drone zone with their drones.
-	get_pilot_data(drones_in_nfz)
+	# no drone zone with their drones. The data is
+	# rendered into the web page in keep_alive.py.
+	return get_pilot_data(drones_in_nfz, time_now)
 
-	# Lastly converting all of the data into html fromat and
-	# updating the html file which results the web page
-	# being updated.
-	convert_info_into_html()
 
+# Loading info about previously encountered criminal pilots
+# into _state once when the program starts.
+_state.update(load_pilot_info())